@@ -13,8 +13,11 @@
 // --- Constantes do Protocolo Serial (Devem corresponder à Unity) ---
 const byte START_BYTE_1 = 0xA5;
 const byte START_BYTE_2 = 0x5A;
+const byte START_BYTE_1_RGB565 = 0xA6;  // Frame em RGB565 (2 bytes/pixel, byte alto primeiro) - scripts Python
+const byte START_BYTE_2_CHECKSUM = 0x5B; // Frame seguido de 1 byte de checksum (byte baixo do CRC32) - scripts Python
 const int NUM_PIXELS = MATRIX_WIDTH * MATRIX_HEIGHT;  // 576
 const int DATA_LENGTH = NUM_PIXELS * 3;               // 1728 bytes (RGB)
+const int RGB565_DATA_LENGTH = NUM_PIXELS * 2;        // 1152 bytes (RGB565)
 const long SERIAL_BAUD_RATE = 115200;                 // Deve ser IGUAL à da Unity
 
 // --- Objeto da Matriz ---
@@ -32,6 +35,19 @@ enum ReadState {
   WAITING_FOR_START2
 };
 ReadState currentState = WAITING_FOR_START1;
+bool frameIsRgb565 = false;  // Definido pelo primeiro start byte do frame atual
+
+// CRC32 (mesmo polinómio do zlib.crc32 do Python), calculado bit a bit para não gastar RAM numa tabela
+uint32_t crc32Buffer(const byte *data, int length) {
+  uint32_t crc = 0xFFFFFFFF;
+  for (int i = 0; i < length; i++) {
+    crc ^= data[i];
+    for (int bit = 0; bit < 8; bit++) {
+      crc = (crc >> 1) ^ (0xEDB88320 & (0 - (crc & 1)));
+    }
+  }
+  return ~crc;
+}
 
 
 void setup() {
@@ -58,25 +74,52 @@ void loop() {
 
     switch (currentState) {
       case WAITING_FOR_START1:
-        if (incomingByte == START_BYTE_1) {
+        if (incomingByte == START_BYTE_1 || incomingByte == START_BYTE_1_RGB565) {
+          frameIsRgb565 = (incomingByte == START_BYTE_1_RGB565);
           currentState = WAITING_FOR_START2;
         }
         break;
 
       case WAITING_FOR_START2:
-        if (incomingByte == START_BYTE_2) {
-          // Sequência de início encontrada, tenta ler os dados RGB.
-          int bytesRead = Serial.readBytes(pixelBuffer, DATA_LENGTH);
+        if (incomingByte == START_BYTE_2 || incomingByte == START_BYTE_2_CHECKSUM) {
+          // Sequência de início encontrada, tenta ler os dados RGB (ou RGB565).
+          int dataLength = frameIsRgb565 ? RGB565_DATA_LENGTH : DATA_LENGTH;
+          int bytesRead = Serial.readBytes(pixelBuffer, dataLength);
+
+          // Se o frame trouxer checksum, valida-o antes de mostrar
+          bool checksumOk = true;
+          if (bytesRead == dataLength && incomingByte == START_BYTE_2_CHECKSUM) {
+            byte receivedChecksum;
+            checksumOk = Serial.readBytes(&receivedChecksum, 1) == 1 &&
+                         receivedChecksum == (byte)(crc32Buffer(pixelBuffer, dataLength) & 0xFF);
+            if (!checksumOk) {
+              Serial.println("Erro: Checksum do frame não confere! Frame descartado.");
+              currentState = WAITING_FOR_START1;
+            }
+          }
 
-          if (bytesRead == DATA_LENGTH) {
+          if (bytesRead == dataLength && checksumOk) {
             // Sucesso! Dados recebidos. Atualiza a matriz lógica.
             int bufferIndex = 0;
             // Preenche a matriz LOGICA (leds(x,y)) com os dados recebidos (RGB)
             for (int y = 0; y < MATRIX_HEIGHT; y++) {
               for (int x = 0; x < MATRIX_WIDTH; x++) {
-                byte r = pixelBuffer[bufferIndex++];
-                byte g = pixelBuffer[bufferIndex++];
-                byte b = pixelBuffer[bufferIndex++];
+                byte r, g, b;
+                if (frameIsRgb565) {
+                  // Expande 5-6-5 bits para 8 bits por canal (repete os bits altos)
+                  uint16_t packed = (pixelBuffer[bufferIndex] << 8) | pixelBuffer[bufferIndex + 1];
+                  bufferIndex += 2;
+                  byte r5 = (packed >> 11) & 0x1F;
+                  byte g6 = (packed >> 5) & 0x3F;
+                  byte b5 = packed & 0x1F;
+                  r = (r5 << 3) | (r5 >> 2);
+                  g = (g6 << 2) | (g6 >> 4);
+                  b = (b5 << 3) | (b5 >> 2);
+                } else {
+                  r = pixelBuffer[bufferIndex++];
+                  g = pixelBuffer[bufferIndex++];
+                  b = pixelBuffer[bufferIndex++];
+                }
                 // leds(x, y) usa o mapeamento da LEDMatrix para colocar
                 // o pixel no lugar certo dentro do array linear leds[0]
                 leds(x, y) = CRGB(r, g, b);
@@ -107,10 +150,10 @@ void loop() {
 
             currentState = WAITING_FOR_START1; // Volta a esperar pelo próximo frame
 
-          } else {
+          } else if (bytesRead != dataLength) {
             // Falha na leitura
             Serial.print("Erro: Leitura de dados falhou! Esperava ");
-            Serial.print(DATA_LENGTH);
+            Serial.print(dataLength);
             Serial.print(" bytes, mas recebeu ");
             Serial.println(bytesRead);
             //Serial.print("Timeout: "); Serial.println(Serial.getTimeout()); // Descomentar para debug
@@ -120,7 +163,8 @@ void loop() {
           }
         } else {
           // Segundo byte não confere, reinicia a busca
-          if (incomingByte == START_BYTE_1) {
+          if (incomingByte == START_BYTE_1 || incomingByte == START_BYTE_1_RGB565) {
+            frameIsRgb565 = (incomingByte == START_BYTE_1_RGB565);
             currentState = WAITING_FOR_START2;
           } else {
             currentState = WAITING_FOR_START1;
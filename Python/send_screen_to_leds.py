@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
+import functools
 import math
+import os
+import queue
 import serial
 import sys
+import threading
 import time
+import zlib # CRC32 for the frame checksum
 import cv2 # Import OpenCV
 import numpy as np # OpenCV uses numpy arrays
 import mss # For screen capture
@@ -10,18 +15,49 @@ import mss # For screen capture
 # --- Configuration ---
 DEFAULT_GRID_WIDTH = 32
 DEFAULT_GRID_HEIGHT = 18
-DEFAULT_BAUD_RATE = 115200
+# The serial link is the real bottleneck: each frame needs (2 + W*H*3) * 10 bits on the wire
+# (8N1), so 115200 baud caps a 32x18 grid at ~6 FPS. USB-CDC boards (Arduino R4, ESP32-S2/S3)
+# ignore the baud rate entirely; USB-serial bridges (CH340, CP2102) handle 921600 fine.
+DEFAULT_BAUD_RATE = 921600
 DEFAULT_TIMEOUT = 0.2
 TARGET_FPS = 5 # Target Frames Per Second to send (as requested)
 # Match the start bytes from your C# script (or Arduino)
 START_BYTE_1 = 0xA5
 START_BYTE_2 = 0x5A
+PACKET_HEADER = bytes((START_BYTE_1, START_BYTE_2)) # Built once, prepended to every frame
+# Pixel formats on the wire: RGB888 (3 bytes/px, same as Unity) or RGB565 (2 bytes/px,
+# ~1.5x the FPS at the same baud rate). The first start byte tells the Arduino which one it gets.
+START_BYTE_1_RGB565 = 0xA6
+PACKET_HEADER_RGB565 = bytes((START_BYTE_1_RGB565, START_BYTE_2))
+PIXEL_FORMATS = {"rgb888": (PACKET_HEADER, 3), "rgb565": (PACKET_HEADER_RGB565, 2)} # header, bytes per pixel
+DEFAULT_PIXEL_FORMAT = "rgb888"
+# Gamma correction applied before sending (1.0 = off). WS2812 LEDs look washed out without it;
+# ~2.2 is a typical value. Applied through a 256-entry lookup table, not per-pixel float math.
+GAMMA = 1.0
+# Append a checksum byte (low byte of the payload's CRC32) so the Arduino can reject corrupted frames.
+# Signalled by START_BYTE_2_CHECKSUM in place of START_BYTE_2; needs the matching Arduino sketch.
+USE_CHECKSUM = False
+START_BYTE_2_CHECKSUM = 0x5B
+# Resize on the GPU through OpenCV's OpenCL T-API (cv2.UMat). Worth trying on machines with
+# a decent iGPU; the full-resolution upload can cost more than it saves, so it's off by default.
+USE_OPENCL_RESIZE = False
+# Pack pixels with pack_zigzag_scalar compiled by numba instead of the NumPy lookup table.
+# Only worth it once per-pixel work is added to that loop (it costs a JIT compile on the first frame).
+USE_NUMBA_ZIGZAG = False
+
+njit = None
+if USE_NUMBA_ZIGZAG:
+    try:
+        from numba import njit # JIT-compiles the scalar zigzag packer
+    except ImportError:
+        print("WARNING: USE_NUMBA_ZIGZAG is set but numba is not installed, using the NumPy packer instead.", file=sys.stderr)
 
 # --- Helper Functions (Pixel Extraction, Input Validation) ---
-def prepare_pixel_data_standard_zigzag(frame_rgb, grid_width, grid_height):
+def prepare_pixel_data_standard_zigzag(frame_rgb, grid_width, grid_height, out):
     """
     Prepares pixel data in RGB format with standard zigzag pattern.
     Expects frame_rgb to be a NumPy array with shape (grid_height, grid_width, 3).
+    Gathers the pixels into out, a (grid_width * grid_height, 3) uint8 array. Returns out, or None on error.
     """
     h, w, channels = frame_rgb.shape
     # Simple check, resize should handle exact dimensions but good to have
@@ -29,27 +65,143 @@ def prepare_pixel_data_standard_zigzag(frame_rgb, grid_width, grid_height):
         print(f"ERROR: Frame dimensions ({w}x{h}x{channels}) mismatch grid ({grid_width}x{grid_height}x3) in prepare_pixel_data!", file=sys.stderr)
         # Attempt to resize again just in case, though ideally it shouldn't happen here
         try:
-            frame_rgb = cv2.resize(frame_rgb, (grid_width, grid_height), interpolation=cv2.INTER_LINEAR)
+            frame_rgb = cv2.resize(frame_rgb, (grid_width, grid_height), interpolation=cv2.INTER_AREA)
             print(f"WARN: Resized frame inside prepare_pixel_data due to mismatch.", file=sys.stderr)
-            h, w, channels = frame_rgb.shape
-            if h != grid_height or w != grid_width or channels != 3: # If still fails
-                 return None
+            # If still fails, the except below reports it and skips the frame
+            assert frame_rgb.shape == (grid_height, grid_width, 3), f"resized frame is {frame_rgb.shape}"
         except Exception as e:
             print(f"ERROR: Failed to resize frame during prepare_pixel_data: {e}", file=sys.stderr)
             return None
 
-    pixel_data = []
-    for y in range(grid_height):
-        if y % 2 == 0: # EVEN row: L -> R
-            for x in range(grid_width):
-                # frame_rgb is already HxWxRGB
-                r, g, b = frame_rgb[y, x]
-                pixel_data.extend([r, g, b])
-        else: # ODD row: R -> L
-            for x in range(grid_width - 1, -1, -1):
-                r, g, b = frame_rgb[y, x]
-                pixel_data.extend([r, g, b])
-    return pixel_data
+    if njit is not None:
+        pack_zigzag_scalar(np.ascontiguousarray(frame_rgb), out)
+        return out
+
+    # Default: gather the pixels in zigzag order with the precomputed index table, straight into out
+    # (mode='clip' writes out directly; the default 'raise' goes through a temporary copy, and the LUT is always in range)
+    zigzag_lut = build_zigzag_lut(grid_width, grid_height)
+    return np.take(frame_rgb.reshape(-1, 3), zigzag_lut, axis=0, out=out, mode='clip')
+
+@functools.lru_cache(maxsize=None)
+def build_zigzag_lut(grid_width, grid_height):
+    """
+    Flat pixel index table mapping LED position -> pixel index in the HxW frame
+    (EVEN rows L -> R, ODD rows R -> L). Built once per grid size and cached.
+    """
+    zigzag_lut = np.arange(grid_width * grid_height, dtype=np.intp).reshape(grid_height, grid_width)
+    zigzag_lut[1::2] = zigzag_lut[1::2, ::-1].copy()
+    return zigzag_lut.reshape(-1)
+
+def pack_zigzag_scalar(frame_rgb, out):
+    """
+    Per-pixel zigzag packer (EVEN rows L -> R, ODD rows R -> L) into out, an (H*W, 3) uint8 array.
+    Only used with USE_NUMBA_ZIGZAG (compiled by numba); a place for per-pixel steps the
+    NumPy lookup-table path can't express.
+    """
+    h, w, _ = frame_rgb.shape
+    idx = 0
+    for y in range(h):
+        for i in range(w):
+            x = i if y % 2 == 0 else w - 1 - i
+            out[idx, 0] = frame_rgb[y, x, 0]
+            out[idx, 1] = frame_rgb[y, x, 1]
+            out[idx, 2] = frame_rgb[y, x, 2]
+            idx += 1
+
+if njit is not None:
+    pack_zigzag_scalar = njit(cache=True)(pack_zigzag_scalar)
+
+def crop_monitor_to_aspect(monitor, grid_width, grid_height):
+    """
+    Returns a capture region centred on monitor with the same aspect ratio as the LED grid,
+    so mss does not grab pixels that the resize would squash in anyway (e.g. on 16:10 or ultrawide screens).
+    """
+    target_aspect = grid_width / grid_height
+    width, height = monitor["width"], monitor["height"]
+    if width / height > target_aspect: # Screen is wider than the grid: trim the sides
+        cropped_width, cropped_height = round(height * target_aspect), height
+    else: # Screen is taller than the grid: trim top and bottom
+        cropped_width, cropped_height = width, round(width / target_aspect)
+    return {
+        "top": monitor["top"] + (height - cropped_height) // 2,
+        "left": monitor["left"] + (width - cropped_width) // 2,
+        "width": cropped_width,
+        "height": cropped_height,
+    }
+
+def send_packets(ser, packet_queue, free_packets, stop_event, send_stats):
+    """
+    Serial writer thread: sends each packet taken from packet_queue until stop_event is set.
+    Runs alongside the capture loop so screen capture overlaps the (slow) serial write.
+    Packets are dropped while the previous one is still waiting in the OS output buffer.
+    Written (or dropped) packets go back to free_packets for the capture loop to refill.
+    Sets stop_event itself if a write fails, so the capture loop stops too.
+    """
+    while not stop_event.is_set():
+        try:
+            packet_buffer = packet_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+
+        try:
+            # A whole packet still queued in the OS means the previous frame hasn't gone out yet:
+            # drop this one instead of blocking behind it, so the LEDs never fall behind the screen
+            if ser.out_waiting >= len(packet_buffer):
+                send_stats["frames_dropped"] += 1
+                continue
+
+            # Send the packet over serial
+            bytes_written = ser.write(packet_buffer)
+            # Optional: Flush immediately if needed, but write usually handles it
+            # ser.flush()
+            send_stats["frames_sent"] += 1 # Increment count of *sent* frames
+
+        except serial.SerialTimeoutException:
+            print(f"\nERROR: Serial write timed out on frame {send_stats['frames_sent'] + 1}. Check connection/receiver. Aborting.", file=sys.stderr)
+            break
+        except serial.SerialException as e:
+            print(f"\nERROR: Serial communication error on frame {send_stats['frames_sent'] + 1}: {e}. Aborting.", file=sys.stderr)
+            break
+        except Exception as e:
+            print(f"\nERROR: Unexpected error during send for frame {send_stats['frames_sent'] + 1}: {e}. Aborting.", file=sys.stderr)
+            break
+        finally:
+            free_packets.put(packet_buffer)
+    stop_event.set()
+
+def build_gamma_lut(gamma):
+    """
+    256-entry uint8 table mapping each 8-bit channel value to its gamma-corrected value.
+    """
+    return ((np.arange(256) / 255.0) ** gamma * 255 + 0.5).astype(np.uint8)
+
+def pack_rgb565(rgb_pixels, out, scratch):
+    """
+    Packs (N, 3) RGB888 pixels into out, N big-endian uint16 (RGB565, high byte first).
+    scratch is a preallocated (2, N) uint16 array; every step runs in place, so nothing is allocated.
+    """
+    packed, channel = scratch
+    np.copyto(packed, rgb_pixels[:, 0])
+    packed &= 0xF8
+    packed <<= 8 # (r >> 3) << 11
+    np.copyto(channel, rgb_pixels[:, 1])
+    channel &= 0xFC
+    channel <<= 3 # (g >> 2) << 5
+    packed |= channel
+    np.copyto(channel, rgb_pixels[:, 2])
+    channel >>= 3
+    packed |= channel
+    np.copyto(out, packed) # Byte-swaps into the big-endian payload on little-endian machines
+    return out
+
+def payload_view(packet_buffer, header_size, pixel_count, pixel_format):
+    """
+    NumPy view on the pixel payload of a preallocated packet, so each frame is written into it in place:
+    (pixel_count, 3) uint8 for rgb888, pixel_count big-endian uint16 for rgb565.
+    """
+    if pixel_format == "rgb565":
+        return np.frombuffer(packet_buffer, dtype=">u2", count=pixel_count, offset=header_size)
+    return np.frombuffer(packet_buffer, dtype=np.uint8, count=pixel_count * 3, offset=header_size).reshape(pixel_count, 3)
 
 def get_int_input(prompt, default_value):
     while True:
@@ -71,10 +223,23 @@ def get_float_input(prompt, default_value):
             else: print("Please enter a positive number.")
         except ValueError: print("Invalid input. Please enter a number.")
 
+def get_choice_input(prompt, choices, default_value):
+    while True:
+        value_str = input(f"{prompt} [{'/'.join(choices)}] (default: {default_value}): ").strip().lower()
+        if not value_str: return default_value
+        if value_str in choices: return value_str
+        else: print(f"Please enter one of: {', '.join(choices)}.")
+
 # --- Main Script ---
 def main():
     print("--- Screen Frame Sender ---")
 
+    # --- OpenCV Threading ---
+    # Keep OpenCV's SIMD paths on and give its parallel resize half the cores,
+    # leaving the rest for capture/decoding and the serial writes
+    cv2.setUseOptimized(True)
+    cv2.setNumThreads(max(1, (os.cpu_count() or 1) // 2))
+
     # --- Get Inputs ---
     serial_port = input("Enter the serial port name (e.g., COM3, /dev/ttyACM0): ").strip()
     if not serial_port:
@@ -83,8 +248,14 @@ def main():
 
     grid_width = get_int_input("Enter target grid width", DEFAULT_GRID_WIDTH)
     grid_height = get_int_input("Enter target grid height", DEFAULT_GRID_HEIGHT)
-    baud_rate = get_int_input("Enter serial baud rate", DEFAULT_BAUD_RATE)
+    baud_rate = get_int_input("Enter serial baud rate (must match SERIAL_BAUD_RATE in the Arduino sketch unless the board is native USB)", DEFAULT_BAUD_RATE)
     timeout = get_float_input("Enter serial write timeout in seconds", DEFAULT_TIMEOUT)
+    pixel_format = get_choice_input("Enter pixel format (rgb565 needs the matching Arduino sketch)", PIXEL_FORMATS, DEFAULT_PIXEL_FORMAT)
+    packet_header, bytes_per_pixel = PIXEL_FORMATS[pixel_format]
+    if USE_CHECKSUM:
+        packet_header = bytes((packet_header[0], START_BYTE_2_CHECKSUM))
+    payload_end = len(packet_header) + grid_width * grid_height * bytes_per_pixel # Checksum byte (if any) goes here
+    checksum_size = 1 if USE_CHECKSUM else 0
     # Target FPS is now fixed
     target_fps = TARGET_FPS
     frame_delay = 1.0 / target_fps
@@ -93,13 +264,51 @@ def main():
     print(f"Serial Port: {serial_port}")
     print(f"Baud Rate:   {baud_rate}")
     print(f"Grid Size:   {grid_width}x{grid_height}")
+    print(f"Pixel Format: {pixel_format} ({bytes_per_pixel} bytes/pixel)")
     print(f"Timeout:     {timeout}s")
     print(f"Target FPS:  {target_fps} (Frame Delay: {frame_delay:.4f}s)")
     print(f"---------------------------")
 
+    gamma_lut = build_gamma_lut(GAMMA) if GAMMA != 1.0 else None
+
+    # Warn if the baud rate cannot keep up with the requested frame rate
+    min_frame_delay = (payload_end + checksum_size) * 10 / baud_rate
+    if frame_delay < min_frame_delay:
+        print(f"WARNING: At {baud_rate} baud each frame takes at least {min_frame_delay:.4f}s on the wire "
+              f"(max ~{1.0 / min_frame_delay:.1f} FPS). Raise the baud rate to reach {target_fps} FPS.", file=sys.stderr)
+
+    use_opencl_resize = USE_OPENCL_RESIZE
+    if use_opencl_resize:
+        cv2.ocl.setUseOpenCL(True)
+        if not cv2.ocl.useOpenCL():
+            print("WARNING: OpenCL is not available to OpenCV, resizing on the CPU instead.", file=sys.stderr)
+            use_opencl_resize = False
+
     # --- Setup Screen Capture and Serial ---
     ser = None
-    frame_count = 0
+    sender_thread = None
+    stop_event = threading.Event()
+    # Holds only the newest packet: if the sender is still busy, the stale frame is dropped
+    packet_queue = queue.Queue(maxsize=1)
+    # Preallocated packet buffers, reused every frame: one being written by the sender,
+    # one waiting in packet_queue and one being filled by the capture loop
+    free_packets = queue.Queue()
+    pixel_count = grid_width * grid_height
+    payload_views = {} # id(packet_buffer) -> view on its pixel payload, made once so frames are written in place
+    for _ in range(3):
+        packet_buffer = bytearray(payload_end + checksum_size)
+        packet_buffer[:len(packet_header)] = packet_header
+        payload_views[id(packet_buffer)] = payload_view(packet_buffer, len(packet_header), pixel_count, pixel_format)
+        free_packets.put(packet_buffer)
+    if pixel_format == "rgb565":
+        # RGB565 packs from a zigzag-ordered RGB888 copy; RGB888 is gathered straight into the packet
+        rgb565_pixels = np.empty((pixel_count, 3), np.uint8)
+        rgb565_scratch = np.empty((2, pixel_count), np.uint16)
+    # Preallocated resize/colour conversion outputs, also reused every frame
+    resized_frame_bgra = np.empty((grid_height, grid_width, 4), np.uint8)
+    rgb_frame = np.empty((grid_height, grid_width, 3), np.uint8)
+    send_stats = {"frames_sent": 0, "frames_dropped": 0}
+    frame_count = 0 # Frames captured and handed to the sender
     total_start_time = time.monotonic()
 
     try:
@@ -112,94 +321,112 @@ def main():
         if len(sct.monitors) < 2:
             print("ERROR: Could not find primary monitor (only found 'all monitors' screen).", file=sys.stderr)
             sys.exit(1)
-        monitor = sct.monitors[1]
-        print(f"Capturing from primary monitor: {monitor['width']}x{monitor['height']} at ({monitor['left']}, {monitor['top']})")
+        primary_monitor = sct.monitors[1]
+        print(f"Found primary monitor: {primary_monitor['width']}x{primary_monitor['height']} at ({primary_monitor['left']}, {primary_monitor['top']})")
+        # Only capture the centred region matching the grid's aspect ratio
+        monitor = crop_monitor_to_aspect(primary_monitor, grid_width, grid_height)
+        print(f"Capturing region: {monitor['width']}x{monitor['height']} at ({monitor['left']}, {monitor['top']})")
 
         # 2. Open Serial Port
         print(f"Attempting to open serial port {serial_port} at {baud_rate} baud...")
-        ser = serial.Serial(serial_port, baud_rate, timeout=1, write_timeout=timeout)
+        # Configure DTR/RTS low before opening. On Windows they stay low through open(), so the
+        # Arduino's auto-reset circuit isn't triggered; Linux/macOS raise DTR while opening, so it still resets
+        ser = serial.Serial()
+        ser.port = serial_port
+        ser.baudrate = baud_rate
+        ser.timeout = 1
+        ser.write_timeout = timeout
+        ser.dtr = False
+        ser.rts = False
+        ser.open()
+        try:
+            # Windows only: a larger driver TX buffer lets ser.write return without waiting for the FIFO to drain
+            ser.set_buffer_size(rx_size=4096, tx_size=65536)
+        except AttributeError:
+            pass # Not available on this platform (Linux/macOS use the kernel's own buffer)
         print(f"Serial port {serial_port} opened successfully.")
         # time.sleep(2.0) # Optional short pause for Arduino/ESP reset
 
+        # 3. Start the serial writer thread
+        sender_thread = threading.Thread(target=send_packets, args=(ser, packet_queue, free_packets, stop_event, send_stats), daemon=True)
+        sender_thread.start()
+
         # --- Main Loop: Capture, Process, Send ---
         print("\nStarting screen capture and sending loop (Ctrl+C to stop)...")
 
-        while True:
-            frame_start_time = time.monotonic()
-
+        next_frame_time = time.perf_counter() + frame_delay # Deadline for the end of the current frame
+        while not stop_event.is_set():
             # --- Capture Screen ---
             # Grab the defined monitor region
             sct_img = sct.grab(monitor)
 
-            # Convert the raw BGRA data from mss to a NumPy array
+            # Wrap the raw BGRA data from mss in a NumPy array (no copy)
             # Note: mss grabs BGRA, OpenCV primarily uses BGR
-            img_bgra = np.array(sct_img)
-
-            # Convert BGRA to BGR (dropping alpha channel) for OpenCV processing
-            frame_bgr = cv2.cvtColor(img_bgra, cv2.COLOR_BGRA2BGR)
+            img_bgra = np.frombuffer(sct_img.raw, dtype=np.uint8).reshape(sct_img.height, sct_img.width, 4)
 
             # --- Process the Frame ---
-            # Resize the captured frame to the target grid size
-            # Use INTER_LINEAR for speed, INTER_AREA might be better for downscaling but slower
-            resized_frame_bgr = cv2.resize(frame_bgr, (grid_width, grid_height), interpolation=cv2.INTER_LINEAR)
-
-            # Convert the resized BGR frame to RGB for sending
+            # Resize the raw BGRA capture straight to the target grid size,
+            # so the colour conversion below only touches grid_width x grid_height pixels
+            # INTER_AREA averages whole source blocks, which suits this heavy downscale
+            if use_opencl_resize:
+                # Upload to the GPU, resize there and download only the tiny result
+                resized_frame_bgra[...] = cv2.resize(cv2.UMat(img_bgra), (grid_width, grid_height), interpolation=cv2.INTER_AREA).get()
+            else:
+                cv2.resize(img_bgra, (grid_width, grid_height), dst=resized_frame_bgra, interpolation=cv2.INTER_AREA)
+
+            # Convert the resized BGRA frame to RGB for sending (dropping alpha channel)
             # (Because prepare_pixel_data expects RGB)
-            rgb_frame = cv2.cvtColor(resized_frame_bgr, cv2.COLOR_BGR2RGB)
+            cv2.cvtColor(resized_frame_bgra, cv2.COLOR_BGRA2RGB, dst=rgb_frame)
 
-            # Prepare the pixel data in Zigzag format
-            pixel_byte_list = prepare_pixel_data_standard_zigzag(rgb_frame, grid_width, grid_height)
+            if gamma_lut is not None:
+                np.take(gamma_lut, rgb_frame, out=rgb_frame) # One table lookup per channel, in place
+
+            # --- Create Serial Packet ---
+            # Refill a free preallocated packet in place (header is already there) -> one ser.write per frame
+            packet_buffer = free_packets.get()
+            payload = payload_views[id(packet_buffer)]
 
-            if pixel_byte_list is None:
+            # Prepare the pixel data in Zigzag format
+            pixels = rgb565_pixels if pixel_format == "rgb565" else payload
+            if prepare_pixel_data_standard_zigzag(rgb_frame, grid_width, grid_height, pixels) is None:
+                 free_packets.put(packet_buffer)
                  print(f"Skipping frame {frame_count + 1} due to pixel extraction error.")
                  # Ensure timing still works even if skipped
                  # We might need a small sleep to prevent a tight loop on errors
                  time.sleep(0.01) # Small delay
                  continue # Skip sending this frame
 
-            # --- Create Serial Packet ---
-            packet_buffer = bytearray([START_BYTE_1, START_BYTE_2])
-            packet_buffer.extend(pixel_byte_list)
+            if pixel_format == "rgb565":
+                pack_rgb565(pixels, payload, rgb565_scratch)
+            if USE_CHECKSUM:
+                packet_buffer[payload_end] = zlib.crc32(memoryview(packet_buffer)[len(packet_header):payload_end]) & 0xFF
 
-            expected_packet_length = 2 + (grid_width * grid_height * 3)
-            if len(packet_buffer) != expected_packet_length:
-                 print(f"WARNING: Frame {frame_count + 1}: Packet length mismatch! Expected {expected_packet_length}, Got {len(packet_buffer)}", file=sys.stderr)
-                 # continue # Optional: Skip sending bad packets
-
-            # --- Send Packet ---
+            # --- Hand Packet to Sender ---
             try:
-                # Send the packet over serial
-                bytes_written = ser.write(packet_buffer)
-                # Optional: Flush immediately if needed, but write usually handles it
-                # ser.flush()
-                frame_count += 1 # Increment count of *sent* frames
-
-            except serial.SerialTimeoutException:
-                print(f"\nERROR: Serial write timed out on frame {frame_count + 1}. Check connection/receiver. Aborting.", file=sys.stderr)
-                break # Exit the main loop
-            except serial.SerialException as e:
-                print(f"\nERROR: Serial communication error on frame {frame_count + 1}: {e}. Aborting.", file=sys.stderr)
-                break # Exit the main loop
-            except Exception as e:
-                print(f"\nERROR: Unexpected error during send for frame {frame_count + 1}: {e}. Aborting.", file=sys.stderr)
-                break # Exit the main loop
+                packet_queue.put_nowait(packet_buffer)
+            except queue.Full:
+                # Sender is still writing the previous frame; replace the stale one
+                try:
+                    free_packets.put(packet_queue.get_nowait())
+                except queue.Empty:
+                    pass
+                packet_queue.put_nowait(packet_buffer)
+            frame_count += 1
 
             # --- Frame Rate Control ---
-            frame_end_time = time.monotonic()
-            processing_time = frame_end_time - frame_start_time
-
-            # Calculate how long to sleep to maintain the target FPS
-            sleep_time = frame_delay - processing_time
-            if sleep_time > 0:
-                time.sleep(sleep_time)
-            #else:
-            #    # Optional: Print if falling behind schedule
-            #    print(f"WARN: Frame {frame_count} processing took too long ({processing_time:.4f}s), falling behind target FPS.", file=sys.stderr)
+            # Sleep until an absolute deadline rather than "frame_delay minus this frame's work",
+            # so sleep overshoot and jitter don't accumulate into drift
+            now = time.perf_counter()
+            if next_frame_time > now:
+                time.sleep(next_frame_time - now)
+            next_frame_time += frame_delay
+            if next_frame_time < now - frame_delay: # Fell far behind (e.g. a long stall): resync
+                next_frame_time = now + frame_delay
 
 
             # Optional: Print progress occasionally
             if frame_count % (target_fps * 10) == 0: # Print every ~10 seconds
-                 print(f"  Sent frame {frame_count}...")
+                 print(f"  Captured frame {frame_count} (sent {send_stats['frames_sent']})...")
 
 
     except KeyboardInterrupt:
@@ -212,6 +439,10 @@ def main():
         # --- Cleanup ---
         total_end_time = time.monotonic()
         print("\n--- Cleaning up ---")
+        # Stop the serial writer before closing the port underneath it
+        stop_event.set()
+        if sender_thread:
+            sender_thread.join()
         # Close the serial port if it was opened
         if ser and ser.is_open:
             ser.close()
@@ -221,9 +452,10 @@ def main():
         # No downloaded file to delete
 
         elapsed_time = total_end_time - total_start_time
-        print(f"\nSent {frame_count} frames in {elapsed_time:.2f} seconds.")
-        if elapsed_time > 0 and frame_count > 0:
-             actual_fps = frame_count / elapsed_time
+        frames_sent = send_stats["frames_sent"]
+        print(f"\nSent {frames_sent} frames ({frame_count} captured, {send_stats['frames_dropped']} dropped while the port was busy) in {elapsed_time:.2f} seconds.")
+        if elapsed_time > 0 and frames_sent > 0:
+             actual_fps = frames_sent / elapsed_time
              print(f"Actual average send FPS: {actual_fps:.2f}")
         print("Exiting.")
 
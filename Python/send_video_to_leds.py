@@ -1,50 +1,137 @@
 #!/usr/bin/env python3
+import functools
 import math
 import serial
 import sys
 import time
-import cv2 # Import OpenCV
-import numpy as np # OpenCV usa numpy arrays
-import subprocess # Para executar yt-dlp
-import os # Para manipulação de arquivos (remoção)
+import zlib # CRC32 for the frame checksum
+import numpy as np # Frames chegam do FFmpeg como bytes RGB, vistos como numpy arrays
+import subprocess # Para executar o FFmpeg
+from yt_dlp import YoutubeDL # Para obter o URL do vídeo (sem lançar o executável yt-dlp)
+from yt_dlp.utils import DownloadError
 import platform # Para verificar o OS (opcional, para encoding)
-# from cv2 import VideoCapture # Não precisa mais importar explicitamente
 
 # --- Configuration ---
 DEFAULT_GRID_WIDTH = 32
 DEFAULT_GRID_HEIGHT = 18
-DEFAULT_BAUD_RATE = 115200
+# The serial link is the real bottleneck: each frame needs (2 + W*H*3) * 10 bits on the wire
+# (8N1), so 115200 baud caps a 32x18 grid at ~6 FPS. USB-CDC boards (Arduino R4, ESP32-S2/S3)
+# ignore the baud rate entirely; USB-serial bridges (CH340, CP2102) handle 921600 fine.
+DEFAULT_BAUD_RATE = 921600
 DEFAULT_TIMEOUT = 0.2
 DEFAULT_TARGET_FPS = 5 # Target Frames Per Second to send (Adjust as needed)
-# O FPS original será lido do arquivo baixado, mas limitaremos o envio a target_fps
+# O FFmpeg converte o vídeo para target_fps antes de enviarmos
 # Match the start bytes from your C# script
 START_BYTE_1 = 0xA5
 START_BYTE_2 = 0x5A
+PACKET_HEADER = bytes((START_BYTE_1, START_BYTE_2)) # Built once, prepended to every frame
+# Pixel formats on the wire: RGB888 (3 bytes/px, same as Unity) or RGB565 (2 bytes/px,
+# ~1.5x the FPS at the same baud rate). The first start byte tells the Arduino which one it gets.
+START_BYTE_1_RGB565 = 0xA6
+PACKET_HEADER_RGB565 = bytes((START_BYTE_1_RGB565, START_BYTE_2))
+PIXEL_FORMATS = {"rgb888": (PACKET_HEADER, 3), "rgb565": (PACKET_HEADER_RGB565, 2)} # header, bytes per pixel
+DEFAULT_PIXEL_FORMAT = "rgb888"
+# Gamma correction applied before sending (1.0 = off). WS2812 LEDs look washed out without it;
+# ~2.2 is a typical value. Applied through a 256-entry lookup table, not per-pixel float math.
+GAMMA = 1.0
+# Append a checksum byte (low byte of the payload's CRC32) so the Arduino can reject corrupted frames.
+# Signalled by START_BYTE_2_CHECKSUM in place of START_BYTE_2; needs the matching Arduino sketch.
+USE_CHECKSUM = False
+START_BYTE_2_CHECKSUM = 0x5B
 # yt-dlp format selection (prioritize mp4 for compatibility)
-# Choose a resolution reasonable for download size and processing
+# Choose a resolution reasonable for streaming bandwidth and decoding
 YTDLP_FORMAT = "bestvideo[ext=mp4][height<=480]/bestvideo[height<=480]/bestvideo"
-DOWNLOAD_FILENAME = "temp_youtube_video" # Base name for downloaded file (extension added by yt-dlp)
-DOWNLOAD_TIMEOUT_SECONDS = 300 # Timeout for the download process (e.g., 5 minutes)
 
+# Pack pixels with pack_zigzag_scalar compiled by numba instead of the NumPy lookup table.
+# Only worth it once per-pixel work is added to that loop (it costs a JIT compile on the first frame).
+USE_NUMBA_ZIGZAG = False
+
+njit = None
+if USE_NUMBA_ZIGZAG:
+    try:
+        from numba import njit # JIT-compiles the scalar zigzag packer
+    except ImportError:
+        print("WARNING: USE_NUMBA_ZIGZAG is set but numba is not installed, using the NumPy packer instead.", file=sys.stderr)
 
 # --- Helper Functions (Pixel Extraction, Input Validation) ---
 # (Keep prepare_pixel_data_standard_zigzag, get_int_input, get_float_input exactly as before)
-def prepare_pixel_data_standard_zigzag(frame_rgb, grid_width, grid_height):
+def prepare_pixel_data_standard_zigzag(frame_rgb, grid_width, grid_height, out):
     h, w, channels = frame_rgb.shape
     if h != grid_height or w != grid_width or channels != 3:
         print(f"ERROR: Frame dimensions ({w}x{h}x{channels}) mismatch grid ({grid_width}x{grid_height}x3) in prepare_pixel_data!", file=sys.stderr)
         return None
-    pixel_data = []
-    for y in range(grid_height):
-        if y % 2 == 0: # EVEN row: L -> R
-            for x in range(grid_width):
-                r, g, b = frame_rgb[y, x]
-                pixel_data.extend([r, g, b])
-        else: # ODD row: R -> L
-            for x in range(grid_width - 1, -1, -1):
-                r, g, b = frame_rgb[y, x]
-                pixel_data.extend([r, g, b])
-    return pixel_data
+
+    if njit is not None:
+        pack_zigzag_scalar(np.ascontiguousarray(frame_rgb), out)
+        return out
+
+    # Default: gather the pixels in zigzag order with the precomputed index table, straight into out
+    # (mode='clip' writes out directly; the default 'raise' goes through a temporary copy, and the LUT is always in range)
+    zigzag_lut = build_zigzag_lut(grid_width, grid_height)
+    return np.take(frame_rgb.reshape(-1, 3), zigzag_lut, axis=0, out=out, mode='clip')
+
+@functools.lru_cache(maxsize=None)
+def build_zigzag_lut(grid_width, grid_height):
+    """
+    Flat pixel index table mapping LED position -> pixel index in the HxW frame
+    (EVEN rows L -> R, ODD rows R -> L). Built once per grid size and cached.
+    """
+    zigzag_lut = np.arange(grid_width * grid_height, dtype=np.intp).reshape(grid_height, grid_width)
+    zigzag_lut[1::2] = zigzag_lut[1::2, ::-1].copy()
+    return zigzag_lut.reshape(-1)
+
+def pack_zigzag_scalar(frame_rgb, out):
+    """
+    Per-pixel zigzag packer (EVEN rows L -> R, ODD rows R -> L) into out, an (H*W, 3) uint8 array.
+    Only used with USE_NUMBA_ZIGZAG (compiled by numba); a place for per-pixel steps the
+    NumPy lookup-table path can't express.
+    """
+    h, w, _ = frame_rgb.shape
+    idx = 0
+    for y in range(h):
+        for i in range(w):
+            x = i if y % 2 == 0 else w - 1 - i
+            out[idx, 0] = frame_rgb[y, x, 0]
+            out[idx, 1] = frame_rgb[y, x, 1]
+            out[idx, 2] = frame_rgb[y, x, 2]
+            idx += 1
+
+if njit is not None:
+    pack_zigzag_scalar = njit(cache=True)(pack_zigzag_scalar)
+
+def build_gamma_lut(gamma):
+    """
+    256-entry uint8 table mapping each 8-bit channel value to its gamma-corrected value.
+    """
+    return ((np.arange(256) / 255.0) ** gamma * 255 + 0.5).astype(np.uint8)
+
+def pack_rgb565(rgb_pixels, out, scratch):
+    """
+    Packs (N, 3) RGB888 pixels into out, N big-endian uint16 (RGB565, high byte first).
+    scratch is a preallocated (2, N) uint16 array; every step runs in place, so nothing is allocated.
+    """
+    packed, channel = scratch
+    np.copyto(packed, rgb_pixels[:, 0])
+    packed &= 0xF8
+    packed <<= 8 # (r >> 3) << 11
+    np.copyto(channel, rgb_pixels[:, 1])
+    channel &= 0xFC
+    channel <<= 3 # (g >> 2) << 5
+    packed |= channel
+    np.copyto(channel, rgb_pixels[:, 2])
+    channel >>= 3
+    packed |= channel
+    np.copyto(out, packed) # Byte-swaps into the big-endian payload on little-endian machines
+    return out
+
+def payload_view(packet_buffer, header_size, pixel_count, pixel_format):
+    """
+    NumPy view on the pixel payload of a preallocated packet, so each frame is written into it in place:
+    (pixel_count, 3) uint8 for rgb888, pixel_count big-endian uint16 for rgb565.
+    """
+    if pixel_format == "rgb565":
+        return np.frombuffer(packet_buffer, dtype=">u2", count=pixel_count, offset=header_size)
+    return np.frombuffer(packet_buffer, dtype=np.uint8, count=pixel_count * 3, offset=header_size).reshape(pixel_count, 3)
 
 def get_int_input(prompt, default_value):
     while True:
@@ -66,93 +153,61 @@ def get_float_input(prompt, default_value):
             else: print("Please enter a positive number.")
         except ValueError: print("Invalid input. Please enter a number.")
 
-# --- Function to DOWNLOAD YouTube video ---
-def download_youtube_video(youtube_url, format_select=YTDLP_FORMAT, output_filename=DOWNLOAD_FILENAME, timeout=DOWNLOAD_TIMEOUT_SECONDS):
+def get_choice_input(prompt, choices, default_value):
+    while True:
+        value_str = input(f"{prompt} [{'/'.join(choices)}] (default: {default_value}): ").strip().lower()
+        if not value_str: return default_value
+        if value_str in choices: return value_str
+        else: print(f"Please enter one of: {', '.join(choices)}.")
+
+# --- Function to STREAM YouTube video ---
+def open_youtube_stream(youtube_url, grid_width, grid_height, target_fps, format_select=YTDLP_FORMAT):
     """
-    Uses yt-dlp to DOWNLOAD a YouTube video to a local file.
-    Returns the full path to the downloaded file on success, None otherwise.
+    Resolves the video's direct media URL in-process with the yt_dlp library and has FFmpeg read it,
+    decode it, drop it to target_fps and scale it to the grid, writing raw RGB frames
+    (grid_width*grid_height*3 bytes each) to its stdout. Nothing is written to disk.
+    Returns the FFmpeg process, or None on failure.
     """
-    # Create the output template - yt-dlp will add the correct extension
-    output_template = f"{output_filename}.%(ext)s"
-
-    print(f"\nAttempting to download video: {youtube_url}")
+    print(f"\nAttempting to stream video: {youtube_url}")
     print(f"Using format selection: {format_select}")
-    print(f"Saving to file pattern: {output_template}")
-    print(f"Download timeout set to: {timeout} seconds")
-
-    downloaded_filepath = None # Variable to store the actual final filename
 
     try:
-        # Command: yt-dlp -f <format> -o <output_template> <youtube_url>
-        command = ['yt-dlp', '-f', format_select, '-o', output_template, youtube_url]
-
-        print("Starting download process...")
-        # Run the command, allow output to be seen, set timeout
-        process = subprocess.run(command, text=True, check=True, encoding='utf-8', timeout=timeout)
-
-        # Unfortunately, yt-dlp doesn't easily return the *exact* filename it used via stdout when downloading.
-        # We need to figure it out. We can list files matching the pattern.
-        # This is a bit fragile but often works.
-        possible_extensions = ['.mp4', '.mkv', '.webm', '.avi', '.mov', '.flv'] # Add more if needed
-        for ext in possible_extensions:
-            potential_file = f"{output_filename}{ext}"
-            if os.path.exists(potential_file):
-                downloaded_filepath = potential_file
-                print(f"Download complete. Video saved as: {downloaded_filepath}")
-                break
-
-        if not downloaded_filepath:
-             # Fallback: Try getting the filename directly if yt-dlp has an option (newer versions might)
-             # Or, more robustly, use yt-dlp --print filename -o template url
-             try:
-                 get_name_command = ['yt-dlp', '--print', 'filename', '-f', format_select, '-o', output_template, youtube_url]
-                 name_process = subprocess.run(get_name_command, capture_output=True, text=True, check=True, encoding='utf-8', timeout=30)
-                 potential_file = name_process.stdout.strip()
-                 if os.path.exists(potential_file):
-                     downloaded_filepath = potential_file
-                     print(f"Download complete. Video saved as: {downloaded_filepath} (using --print filename)")
-                 else:
-                     print(f"ERROR: yt-dlp reported filename '{potential_file}' but it doesn't exist.", file=sys.stderr)
-                     return None
-             except Exception as name_e:
-                 print(f"ERROR: Could not determine exact downloaded filename automatically after download completed successfully according to yt-dlp.", file=sys.stderr)
-                 print(f"Attempted pattern: {output_template}. Please check manually.", file=sys.stderr)
-                 print(f"Error during filename check: {name_e}", file=sys.stderr)
-                 return None
-
-
-        return downloaded_filepath
-
-    except FileNotFoundError:
-        print("ERROR: 'yt-dlp' command not found. Is yt-dlp installed and in your PATH?", file=sys.stderr)
-        return None
-    except subprocess.TimeoutExpired:
-        print(f"ERROR: yt-dlp download timed out after {timeout} seconds.", file=sys.stderr)
-        # Clean up potentially partial file
-        print("Attempting to clean up potentially partial download...")
-        possible_extensions = ['.mp4', '.mkv', '.webm', '.avi', '.mov', '.flv', '.part']
-        for ext in possible_extensions:
-            potential_file = f"{output_filename}{ext}"
-            if os.path.exists(potential_file):
-                try:
-                    os.remove(potential_file)
-                    print(f"Removed partial file: {potential_file}")
-                except OSError as e:
-                    print(f"Warning: Could not remove partial file {potential_file}: {e}", file=sys.stderr)
-        return None
-    except subprocess.CalledProcessError as e:
-        print(f"ERROR: yt-dlp failed with error code {e.returncode}.", file=sys.stderr)
-        # stderr might be captured if capture_output=True, but we didn't use it here
-        # print(f"yt-dlp stderr:\n{e.stderr}", file=sys.stderr) # Uncomment if needed
+        with YoutubeDL({'format': format_select, 'noplaylist': True, 'quiet': True, 'no_warnings': True}) as ydl:
+            info = ydl.extract_info(youtube_url, download=False)
+    except DownloadError as e:
+        print(f"ERROR: yt-dlp could not resolve the video: {e}", file=sys.stderr)
         print("Check the YouTube URL, video availability, format selection, and your internet connection.", file=sys.stderr)
         return None
-    except Exception as e:
-        print(f"ERROR: An unexpected error occurred while running yt-dlp: {e}", file=sys.stderr)
+    media_url = info.get('url')
+    if not media_url:
+        # Playlists and merged formats (e.g. 'bv*+ba') have no single URL FFmpeg can open
+        print("ERROR: yt-dlp did not return a single stream URL for this link.", file=sys.stderr)
+        print("Use a single video URL (not a playlist) and a format that selects one stream (no '+').", file=sys.stderr)
         return None
+    print(f"Resolved: {info.get('title', youtube_url)} ({info.get('width')}x{info.get('height')}, {info.get('ext')})")
+
+    # Same HTTP headers yt-dlp would have used, so the media server accepts FFmpeg's requests
+    http_headers = ''.join(f"{key}: {value}\r\n" for key, value in info.get('http_headers', {}).items())
+    # FFmpeg does the frame rate conversion and the area-averaging downscale before handing us any pixels
+    ffmpeg_command = [
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        '-hwaccel', 'auto', '-headers', http_headers, '-i', media_url,
+        '-vf', f'fps={target_fps},scale={grid_width}:{grid_height}:flags=area',
+        '-pix_fmt', 'rgb24', '-f', 'rawvideo', 'pipe:1',
+    ]
+
+    try:
+        ffmpeg_process = subprocess.Popen(ffmpeg_command, stdout=subprocess.PIPE)
+    except FileNotFoundError:
+        print("ERROR: 'ffmpeg' command not found. Is FFmpeg installed and in your PATH?", file=sys.stderr)
+        return None
+
+    print("Streaming started.")
+    return ffmpeg_process
 
 # --- Main Script ---
 def main():
-    print("--- YouTube Video Frame Sender (Download Mode) ---")
+    print("--- YouTube Video Frame Sender (Streaming Mode) ---")
 
     # --- Get Inputs ---
     youtube_url = input("Enter the YouTube video URL: ").strip()
@@ -167,8 +222,14 @@ def main():
 
     grid_width = get_int_input("Enter target grid width", DEFAULT_GRID_WIDTH)
     grid_height = get_int_input("Enter target grid height", DEFAULT_GRID_HEIGHT)
-    baud_rate = get_int_input("Enter serial baud rate", DEFAULT_BAUD_RATE)
+    baud_rate = get_int_input("Enter serial baud rate (must match SERIAL_BAUD_RATE in the Arduino sketch unless the board is native USB)", DEFAULT_BAUD_RATE)
     timeout = get_float_input("Enter serial write timeout in seconds", DEFAULT_TIMEOUT)
+    pixel_format = get_choice_input("Enter pixel format (rgb565 needs the matching Arduino sketch)", PIXEL_FORMATS, DEFAULT_PIXEL_FORMAT)
+    packet_header, bytes_per_pixel = PIXEL_FORMATS[pixel_format]
+    if USE_CHECKSUM:
+        packet_header = bytes((packet_header[0], START_BYTE_2_CHECKSUM))
+    payload_end = len(packet_header) + grid_width * grid_height * bytes_per_pixel # Checksum byte (if any) goes here
+    checksum_size = 1 if USE_CHECKSUM else 0
     target_fps = get_int_input("Enter target FPS to send", DEFAULT_TARGET_FPS)
 
     frame_delay = 1.0 / target_fps
@@ -178,104 +239,110 @@ def main():
     print(f"Serial Port: {serial_port}")
     print(f"Baud Rate:   {baud_rate}")
     print(f"Grid Size:   {grid_width}x{grid_height}")
+    print(f"Pixel Format: {pixel_format} ({bytes_per_pixel} bytes/pixel)")
     print(f"Timeout:     {timeout}s")
     print(f"Target FPS:  {target_fps} (Frame Delay: {frame_delay:.4f}s)")
-    print(f"Download File: {DOWNLOAD_FILENAME}.*")
     print(f"---------------------------")
 
-    # --- Download Video ---
-    video_filepath = download_youtube_video(youtube_url)
-    if not video_filepath:
-        print("Exiting due to download failure.")
-        sys.exit(1)
+    gamma_lut = build_gamma_lut(GAMMA) if GAMMA != 1.0 else None
 
-    # --- Setup Video Capture (from local file) and Serial ---
-    cap = None
+    # Warn if the baud rate cannot keep up with the requested frame rate
+    min_frame_delay = (payload_end + checksum_size) * 10 / baud_rate
+    if frame_delay < min_frame_delay:
+        print(f"WARNING: At {baud_rate} baud each frame takes at least {min_frame_delay:.4f}s on the wire "
+              f"(max ~{1.0 / min_frame_delay:.1f} FPS). Raise the baud rate to reach {target_fps} FPS.", file=sys.stderr)
+
+    # --- Setup Video Stream and Serial ---
+    ffmpeg_process = None
     ser = None
     frame_count = 0
+    frames_dropped = 0 # Frames skipped because the serial port was still busy
     total_start_time = time.monotonic()
 
 
     try:
-        # 1. Open Video File
-        print(f"\nOpening downloaded video file: {video_filepath}")
-        cap = cv2.VideoCapture(video_filepath)
-        if not cap.isOpened():
-            print(f"ERROR: OpenCV could not open the downloaded video file: {video_filepath}", file=sys.stderr)
-            # Attempt cleanup before exiting
-            if os.path.exists(video_filepath):
-                try:
-                    os.remove(video_filepath)
-                    print(f"Cleaned up downloaded file: {video_filepath}")
-                except OSError as e:
-                    print(f"Warning: Could not clean up file {video_filepath}: {e}", file=sys.stderr)
+        # 1. Start Streaming (yt-dlp URL -> FFmpeg)
+        ffmpeg_process = open_youtube_stream(youtube_url, grid_width, grid_height, target_fps)
+        if not ffmpeg_process:
+            print("Exiting due to streaming failure.")
             sys.exit(1)
 
-        # Get video properties from the file
-        original_fps = cap.get(cv2.CAP_PROP_FPS)
-        original_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        original_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        original_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        print(f"Video file opened. Info: {original_width}x{original_height} @ {original_fps:.2f} FPS, {original_frames} frames")
-        if original_fps <= 0:
-            print("Warning: Could not read valid FPS from video file. Frame skipping might be inaccurate.", file=sys.stderr)
-            frames_to_skip = 1 # Default to reading every frame if FPS is unknown
-        else:
-            # Calculate frames to skip based on original FPS and target sending FPS
-            frames_to_skip = max(1, round(original_fps / target_fps)) # Read at least 1 frame
-        print(f"Target send FPS is {target_fps}. Reading approx. 1 frame for every {frames_to_skip} frames in the video.")
-
-
         # 2. Open Serial Port
         print(f"Attempting to open serial port {serial_port} at {baud_rate} baud...")
-        ser = serial.Serial(serial_port, baud_rate, timeout=1, write_timeout=timeout)
+        # Configure DTR/RTS low before opening. On Windows they stay low through open(), so the
+        # Arduino's auto-reset circuit isn't triggered; Linux/macOS raise DTR while opening, so it still resets
+        ser = serial.Serial()
+        ser.port = serial_port
+        ser.baudrate = baud_rate
+        ser.timeout = 1
+        ser.write_timeout = timeout
+        ser.dtr = False
+        ser.rts = False
+        ser.open()
+        try:
+            # Windows only: a larger driver TX buffer lets ser.write return without waiting for the FIFO to drain
+            ser.set_buffer_size(rx_size=4096, tx_size=65536)
+        except AttributeError:
+            pass # Not available on this platform (Linux/macOS use the kernel's own buffer)
         print(f"Serial port {serial_port} opened successfully.")
         # time.sleep(2.0) # Optional short pause
 
+        # Preallocated buffers, reused every frame instead of allocating fresh ones
+        # FFmpeg already outputs grid-sized RGB frames, so rgb_frame is just a view on frame_buffer
+        frame_buffer = bytearray(grid_width * grid_height * 3)
+        rgb_frame = np.frombuffer(frame_buffer, dtype=np.uint8).reshape(grid_height, grid_width, 3)
+        packet_buffer = bytearray(payload_end + checksum_size)
+        packet_buffer[:len(packet_header)] = packet_header
+        # View on the packet's pixel payload, so each frame is written into the packet in place
+        pixel_count = grid_width * grid_height
+        payload = payload_view(packet_buffer, len(packet_header), pixel_count, pixel_format)
+        if pixel_format == "rgb565":
+            # RGB565 packs from a zigzag-ordered RGB888 copy; RGB888 is gathered straight into the packet
+            rgb_pixels = np.empty((pixel_count, 3), np.uint8)
+            rgb565_scratch = np.empty((2, pixel_count), np.uint16)
+        else:
+            rgb_pixels = payload
+
         # --- Main Loop: Read, Process, Send ---
         print("\nStarting frame processing and sending loop (Ctrl+C to stop)...")
-        processed_frame_index = 0 # Track which frame we are processing from the source
-        last_frame_send_time = time.monotonic() # Initialize timing
+        processed_frame_index = 0 # Track which frame we are processing from the stream
+        next_frame_time = time.perf_counter() + frame_delay # Deadline for the end of the current frame
 
         while True:
-            frame_start_time = time.monotonic()
-
-            # --- Read Frame (with skipping) ---
-            ret = False
-            frame = None
-            for _ in range(frames_to_skip):
-                 ret, frame = cap.read()
-                 processed_frame_index += 1
-                 if not ret: # If reading fails at any point (incl. end of file), break the skip loop
-                     break
-
-            if not ret:
-                print(f"\nEnd of video file reached after processing frame {processed_frame_index -1}.")
+            # --- Read Frame (already at target FPS and grid size) ---
+            bytes_read = ffmpeg_process.stdout.readinto(frame_buffer)
+            if bytes_read != len(frame_buffer):
+                # FFmpeg closed its output: either the video ended or FFmpeg failed (expired URL, HTTP 403, bad codec...)
+                if ffmpeg_process.wait() != 0:
+                    print(f"\nERROR: FFmpeg stopped with exit code {ffmpeg_process.returncode} after frame {processed_frame_index}.", file=sys.stderr)
+                    print("Could not stream the video. The media URL may have expired; try running the script again.", file=sys.stderr)
+                    sys.exit(1)
+                print(f"\nEnd of video stream reached after processing frame {processed_frame_index}.")
                 break # Exit the main loop
+            processed_frame_index += 1
 
             # --- Process the Frame ---
-            resized_frame = cv2.resize(frame, (grid_width, grid_height), interpolation=cv2.INTER_LINEAR)
-            rgb_frame = cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB)
-            pixel_byte_list = prepare_pixel_data_standard_zigzag(rgb_frame, grid_width, grid_height)
-
-            if pixel_byte_list is None:
-                 print(f"Skipping source frame index {processed_frame_index -1} due to pixel extraction error.")
-                 # Adjust timing correctly even if skipped
-                 last_frame_send_time = time.monotonic() # Reset timer to avoid rush on next frame
+            if gamma_lut is not None:
+                np.take(gamma_lut, rgb_frame, out=rgb_frame) # One table lookup per channel, in place
+            if prepare_pixel_data_standard_zigzag(rgb_frame, grid_width, grid_height, rgb_pixels) is None:
+                 print(f"Skipping stream frame index {processed_frame_index} due to pixel extraction error.")
                  continue
 
-            packet_buffer = bytearray([START_BYTE_1, START_BYTE_2])
-            packet_buffer.extend(pixel_byte_list)
-
-            expected_packet_length = 2 + (grid_width * grid_height * 3)
-            if len(packet_buffer) != expected_packet_length:
-                 print(f"WARNING: Frame {frame_count + 1} (Source idx {processed_frame_index -1}): Packet length mismatch! Expected {expected_packet_length}, Got {len(packet_buffer)}", file=sys.stderr)
-                 # continue # Optional: Skip sending bad packets
+            # The preallocated packet is refilled in place (header is already there) -> one ser.write per frame
+            if pixel_format == "rgb565":
+                pack_rgb565(rgb_pixels, payload, rgb565_scratch)
+            if USE_CHECKSUM:
+                packet_buffer[payload_end] = zlib.crc32(memoryview(packet_buffer)[len(packet_header):payload_end]) & 0xFF
 
             # --- Send Packet ---
             try:
-                bytes_written = ser.write(packet_buffer)
-                frame_count += 1 # Increment count of *sent* frames
+                # A whole packet still queued in the OS means the previous frame hasn't gone out yet:
+                # drop this one instead of blocking behind it, so the LEDs never fall behind the video
+                if ser.out_waiting >= len(packet_buffer):
+                    frames_dropped += 1
+                else:
+                    bytes_written = ser.write(packet_buffer)
+                    frame_count += 1 # Increment count of *sent* frames
 
             except serial.SerialTimeoutException:
                 print(f"\nERROR: Serial write timed out on frame {frame_count + 1}. Aborting.", file=sys.stderr)
@@ -288,19 +355,19 @@ def main():
                 break
 
             # --- Frame Rate Control ---
-            frame_end_time = time.monotonic()
-            processing_time = frame_end_time - frame_start_time
-            # Calculate sleep needed based on *target* delay, accounting for processing time
-            sleep_time = frame_delay - processing_time
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+            # Sleep until an absolute deadline rather than "frame_delay minus this frame's work",
+            # so sleep overshoot and jitter don't accumulate into drift
+            now = time.perf_counter()
+            if next_frame_time > now:
+                time.sleep(next_frame_time - now)
+            next_frame_time += frame_delay
+            if next_frame_time < now - frame_delay: # Fell far behind (e.g. a long stall): resync
+                next_frame_time = now + frame_delay
 
-            # Optional: Print progress more aligned with video progress
-            if frame_count % (target_fps * 10) == 0 and original_frames > 0: # Print every ~10s of sent frames
-                 progress_percent = (processed_frame_index / original_frames) * 100
-                 print(f"  Sent frame {frame_count}... (Video progress: ~{progress_percent:.1f}%)")
-            elif frame_count % (target_fps * 10) == 0:
-                 print(f"  Sent frame {frame_count}...")
+            # Optional: Print progress occasionally
+            # Keyed on stream frames, which advance every loop even when a frame is dropped
+            if processed_frame_index % (target_fps * 10) == 0: # Print every ~10s of video
+                 print(f"  Sent frame {frame_count}... (~{processed_frame_index / target_fps:.0f}s into the video)")
 
 
     except KeyboardInterrupt:
@@ -311,27 +378,16 @@ def main():
         # --- Cleanup ---
         total_end_time = time.monotonic()
         print("\n--- Cleaning up ---")
-        if cap and cap.isOpened():
-            cap.release()
-            print("Video file capture released.")
-            cv2.destroyAllWindows()
+        if ffmpeg_process:
+            ffmpeg_process.kill()
+            ffmpeg_process.wait()
+            print("Video stream stopped.")
         if ser and ser.is_open:
             ser.close()
             print(f"Serial port {serial_port} closed.")
 
-        # Delete the downloaded video file
-        if video_filepath and os.path.exists(video_filepath):
-            try:
-                os.remove(video_filepath)
-                print(f"Successfully deleted downloaded file: {video_filepath}")
-            except OSError as e:
-                print(f"ERROR: Could not delete downloaded file {video_filepath}: {e}", file=sys.stderr)
-        elif video_filepath:
-             print(f"Info: Downloaded file path was '{video_filepath}' but it wasn't found for cleanup.")
-
-
         elapsed_time = total_end_time - total_start_time
-        print(f"\nSent {frame_count} frames in {elapsed_time:.2f} seconds.")
+        print(f"\nSent {frame_count} frames ({frames_dropped} dropped while the port was busy) in {elapsed_time:.2f} seconds.")
         if elapsed_time > 0 and frame_count > 0:
              actual_fps = frame_count / elapsed_time
              print(f"Actual average send FPS: {actual_fps:.2f}")
@@ -339,4 +395,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()